@@ -1,19 +1,44 @@
 #!/usr/bin/env python3
 import argparse
+import http.client
 import json
 import os
 import re
 import subprocess
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Set
-from urllib import error, request
+from typing import List, Optional, Set
+from urllib.parse import urlsplit
 
 
+# Possessive quantifiers (Python 3.11+) keep the line/column suffix from
+# backtracking on stack-trace style ":digits:digits" chains.
 FILE_PATTERN = re.compile(
-    r"([A-Za-z0-9_./\\-]+\.(?:ts|tsx|js|jsx|mjs|cjs|json|ya?ml|py|sh|toml|md|css|html))(?::\d+(?::\d+)?)?"
+    r"([A-Za-z0-9_./\\-]+\.(?:ts|tsx|js|jsx|mjs|cjs|json|ya?ml|py|sh|toml|md|css|html))(?::\d++(?::\d++)?+)?+"
 )
-FENCE_PATTERN = re.compile(r"^```(?:diff|patch)?\s*|\s*```$", re.IGNORECASE | re.MULTILINE)
+try:
+    import orjson
+
+    def json_dumps(payload: dict) -> bytes:
+        return orjson.dumps(payload)
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+except ImportError:
+
+    def json_dumps(payload: dict) -> bytes:
+        return json.dumps(payload).encode("utf-8")
+
+    def json_loads(data):
+        return json.loads(data)
+
+
+LOG_ERROR_PATTERN = re.compile(r"error|fail|traceback|exception", re.IGNORECASE)
+LOG_ERROR_CONTEXT_LINES = 5
+TEXT_CONTENT_TYPES = frozenset({"output_text", "text"})
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,12 +52,24 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--max-files", type=int, default=0, help="Maximum changed files budget.")
     parser.add_argument("--max-changed-lines", type=int, default=0, help="Maximum total changed lines budget.")
     parser.add_argument("--max-log-chars", type=int, default=50000, help="Maximum characters from log tail.")
+    parser.add_argument(
+        "--max-condensed-log-chars",
+        type=int,
+        default=20000,
+        help="Maximum characters after condensing the log around error lines.",
+    )
     parser.add_argument(
         "--max-snippet-chars",
         type=int,
         default=12000,
         help="Maximum characters per file snippet.",
     )
+    parser.add_argument(
+        "--max-file-context-chars",
+        type=int,
+        default=60000,
+        help="Maximum total characters across all file snippets.",
+    )
     parser.add_argument(
         "--max-candidate-files",
         type=int,
@@ -43,49 +80,107 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def compute_ls_files_cache_key(repo_root: Path) -> str:
+    head = subprocess.run(
+        ["git", "-C", str(repo_root), "rev-parse", "HEAD"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        check=False,
+    )
+    if head.returncode != 0:
+        return ""
+    try:
+        index_mtime = os.stat(repo_root / ".git" / "index").st_mtime_ns
+    except OSError:
+        return ""
+    return f"{head.stdout.strip()}:{index_mtime}"
+
+
+def load_tracked_files(repo_root: Path) -> List[str]:
+    """Run git ls-files, caching the listing across retry attempts on the same tree."""
+    cache_path = repo_root / ".git" / "auto_fix_lsfiles.cache"
+    key = compute_ls_files_cache_key(repo_root)
+    if key:
+        try:
+            cached = cache_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            cached = []
+        if cached and cached[0] == key:
+            return cached[1:]
+
+    tracked_files = run_git_ls_files(repo_root)
+    if key and tracked_files:
+        try:
+            cache_path.write_text("\n".join([key] + tracked_files), encoding="utf-8")
+        except OSError:
+            pass
+    return tracked_files
+
+
 def run_git_ls_files(repo_root: Path) -> List[str]:
+    # NUL-delimited output needs no per-line stripping and is unambiguous
+    # for paths containing unusual characters.
     result = subprocess.run(
-        ["git", "-C", str(repo_root), "ls-files"],
+        ["git", "-C", str(repo_root), "ls-files", "-z"],
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
+        stderr=subprocess.DEVNULL,
         check=False,
     )
     if result.returncode != 0:
         return []
-    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+    return [os.fsdecode(entry) for entry in result.stdout.split(b"\0") if entry]
+
+
+def build_suffix_index(tracked_files: List[str]) -> dict:
+    suffix_index: dict = {}
+    for path in tracked_files:
+        parts = path.split("/")
+        for start in range(1, len(parts)):
+            suffix_index.setdefault("/".join(parts[start:]), path)
+    return suffix_index
+
+
+def normalize_log_path(raw_path: str) -> str:
+    normalized = raw_path.replace("\\", "/").strip(" .,:;()[]{}<>\"'")
+    if normalized.startswith("a/") or normalized.startswith("b/"):
+        normalized = normalized[2:]
+    if normalized.startswith("/"):
+        normalized = normalized[1:]
+    return normalized
 
 
 def detect_candidate_files(log_text: str, repo_root: Path, tracked_files: List[str], max_candidates: int) -> List[str]:
     tracked_set: Set[str] = set(tracked_files)
-    candidates: List[str] = []
-    suffix_map = {f"/{path}": path for path in tracked_files}
-
-    def try_add(rel_path: str) -> None:
-        normalized = rel_path.replace("\\", "/").strip(" .,:;()[]{}<>\"'")
-        if not normalized:
-            return
-        if normalized.startswith("a/") or normalized.startswith("b/"):
-            normalized = normalized[2:]
-        if normalized.startswith("/"):
-            normalized = normalized[1:]
-        if normalized not in tracked_set:
-            matched = suffix_map.get(f"/{normalized}")
-            if not matched:
-                for tracked in tracked_files:
-                    if normalized.endswith(f"/{tracked}"):
-                        matched = tracked
-                        break
-            if matched:
-                normalized = matched
-        if normalized in tracked_set and normalized not in candidates:
-            candidates.append(normalized)
-
-    for match in FILE_PATTERN.finditer(log_text):
-        try_add(match.group(1))
+    suffix_index = build_suffix_index(tracked_files)
+
+    # Resolve each distinct raw match once, but count every occurrence so the
+    # files the log mentions most often come first in the prompt.
+    resolution_cache: dict = {}
+    occurrences: Counter = Counter()
+    first_seen: List[str] = []
+    for raw_path in FILE_PATTERN.findall(log_text):
+        if raw_path in resolution_cache:
+            resolved = resolution_cache[raw_path]
+        else:
+            normalized = normalize_log_path(raw_path)
+            if normalized and normalized not in tracked_set:
+                normalized = suffix_index.get(normalized, "")
+            resolved = normalized
+            resolution_cache[raw_path] = resolved
+        if not resolved:
+            continue
+        if resolved not in occurrences:
+            first_seen.append(resolved)
+        occurrences[resolved] += 1
+
+    # Stable sort: most-mentioned files first, ties keep log order.
+    candidates = sorted(first_seen, key=lambda rel_path: -occurrences[rel_path])
+    seen: Set[str] = set(candidates)
 
     for fallback in ["package.json", "package-lock.json", "tsconfig.json"]:
-        if fallback in tracked_set and fallback not in candidates:
+        if fallback in tracked_set and fallback not in seen:
+            seen.add(fallback)
             candidates.append(fallback)
 
     if not candidates:
@@ -98,12 +193,45 @@ def detect_candidate_files(log_text: str, repo_root: Path, tracked_files: List[s
     return candidates[:max_candidates]
 
 
+def condense_log_text(log_text: str, max_chars: int) -> str:
+    if len(log_text) <= max_chars:
+        return log_text
+
+    lines = log_text.splitlines()
+    keep: Set[int] = set()
+    for index, line in enumerate(lines):
+        if LOG_ERROR_PATTERN.search(line):
+            start = max(0, index - LOG_ERROR_CONTEXT_LINES)
+            end = min(len(lines), index + LOG_ERROR_CONTEXT_LINES + 1)
+            keep.update(range(start, end))
+
+    if not keep:
+        return log_text[-max_chars:]
+
+    blocks: List[str] = []
+    previous = -2
+    for index in sorted(keep):
+        if index != previous + 1 and blocks:
+            blocks.append("...")
+        blocks.append(lines[index])
+        previous = index
+    condensed = "\n".join(blocks)
+
+    if len(condensed) > max_chars:
+        condensed = condensed[-max_chars:]
+    return condensed
+
+
 def read_file_snippet(path: Path, max_chars: int) -> str:
+    # Read at most max_chars + 1 bytes so multi-MB lockfiles/bundles are never
+    # loaded whole; one extra byte tells us whether truncation happened.
     try:
-        content = path.read_text(encoding="utf-8", errors="replace")
+        with open(path, "rb") as handle:
+            buf = handle.read(max_chars + 1)
     except OSError:
         return ""
-    if len(content) > max_chars:
+    content = buf.decode("utf-8", errors="replace")
+    if len(buf) > max_chars:
         return content[:max_chars] + "\n\n/* ...truncated... */\n"
     return content
 
@@ -113,19 +241,62 @@ def extract_text_from_response(payload: dict) -> str:
     if isinstance(direct, str) and direct.strip():
         return direct.strip()
 
+    text_types = TEXT_CONTENT_TYPES
     chunks: List[str] = []
     for item in payload.get("output", []):
         if item.get("type") == "message":
             for content in item.get("content", []):
-                if content.get("type") in {"output_text", "text"} and isinstance(content.get("text"), str):
+                if content.get("type") in text_types and isinstance(content.get("text"), str):
                     chunks.append(content["text"])
-        elif item.get("type") in {"output_text", "text"} and isinstance(item.get("text"), str):
+        elif item.get("type") in text_types and isinstance(item.get("text"), str):
             chunks.append(item["text"])
     return "\n".join(chunks).strip()
 
 
+def parse_sse_stream(resp) -> str:
+    """Decode a Responses API event stream incrementally instead of buffering it."""
+    chunks: List[str] = []
+    completed_payload: Optional[dict] = None
+    for raw_line in resp:
+        line = raw_line.decode("utf-8", errors="replace").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            event = json_loads(data)
+        except ValueError:
+            continue
+        event_type = event.get("type")
+        if event_type == "response.output_text.delta" and isinstance(event.get("delta"), str):
+            chunks.append(event["delta"])
+        elif event_type == "response.completed" and isinstance(event.get("response"), dict):
+            completed_payload = event["response"]
+    resp.read()  # drain any trailing bytes so the keep-alive connection stays reusable
+
+    if chunks:
+        return "".join(chunks).strip()
+    if completed_payload is not None:
+        return extract_text_from_response(completed_payload)
+    return ""
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a leading/trailing markdown fence without a regex pass."""
+    stripped = text.strip()
+    lowered = stripped.lower()
+    for prefix in ("```diff", "```patch", "```"):
+        if lowered.startswith(prefix):
+            stripped = stripped[len(prefix) :].lstrip()
+            break
+    if stripped.endswith("```"):
+        stripped = stripped[:-3].rstrip()
+    return stripped
+
+
 def normalize_patch(text: str) -> str:
-    cleaned = FENCE_PATTERN.sub("", text).strip()
+    cleaned = strip_code_fence(text)
     if cleaned.upper() == "NO_FIX":
         return ""
     if "diff --git " not in cleaned and ("--- " not in cleaned or "+++ " not in cleaned):
@@ -183,6 +354,38 @@ def build_prompts(
     return system_prompt, user_prompt
 
 
+_API_CONNECTION: Optional[http.client.HTTPConnection] = None
+_API_CONNECTION_KEY: Optional[str] = None
+
+
+def get_api_connection(endpoint: str, timeout: int) -> tuple:
+    """Return (connection, base_path), reusing one keep-alive connection per endpoint."""
+    global _API_CONNECTION, _API_CONNECTION_KEY
+
+    parts = urlsplit(endpoint)
+    if not parts.netloc:
+        raise RuntimeError(f"Invalid API endpoint: {endpoint}")
+
+    key = f"{parts.scheme}://{parts.netloc}"
+    if _API_CONNECTION is None or _API_CONNECTION_KEY != key:
+        if _API_CONNECTION is not None:
+            _API_CONNECTION.close()
+        if parts.scheme == "https":
+            _API_CONNECTION = http.client.HTTPSConnection(parts.netloc, timeout=timeout)
+        else:
+            _API_CONNECTION = http.client.HTTPConnection(parts.netloc, timeout=timeout)
+        _API_CONNECTION_KEY = key
+    return _API_CONNECTION, parts.path.rstrip("/")
+
+
+def reset_api_connection() -> None:
+    global _API_CONNECTION, _API_CONNECTION_KEY
+    if _API_CONNECTION is not None:
+        _API_CONNECTION.close()
+    _API_CONNECTION = None
+    _API_CONNECTION_KEY = None
+
+
 def call_responses_api(system_prompt: str, user_prompt: str) -> str:
     api_key = os.getenv("CODEX_API_KEY") or os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -195,6 +398,7 @@ def call_responses_api(system_prompt: str, user_prompt: str) -> str:
 
     payload = {
         "model": model,
+        "stream": True,
         "input": [
             {
                 "role": "system",
@@ -207,31 +411,40 @@ def call_responses_api(system_prompt: str, user_prompt: str) -> str:
         ],
     }
 
-    req = request.Request(
-        url=f"{endpoint}/responses",
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        method="POST",
-    )
+    connection, base_path = get_api_connection(endpoint, timeout)
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Connection": "keep-alive",
+    }
 
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
+        connection.request(
+            "POST",
+            f"{base_path}/responses",
+            body=json_dumps(payload),
+            headers=headers,
+        )
+        resp = connection.getresponse()
+        if resp.status >= 400:
+            detail = resp.read().decode("utf-8", errors="replace")
+            raise RuntimeError(f"API request failed: HTTP {resp.status}: {detail}")
+
+        content_type = resp.getheader("Content-Type") or ""
+        if "text/event-stream" in content_type:
+            text = parse_sse_stream(resp)
+        else:
+            # Non-stream fallback for endpoints that ignore the stream flag.
             raw = resp.read().decode("utf-8", errors="replace")
-    except error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"API request failed: HTTP {exc.code}: {detail}") from exc
-    except error.URLError as exc:
+            try:
+                data = json_loads(raw)
+            except ValueError as exc:
+                raise RuntimeError(f"Invalid API JSON response: {raw[:500]}") from exc
+            text = extract_text_from_response(data)
+    except (http.client.HTTPException, OSError) as exc:
+        reset_api_connection()
         raise RuntimeError(f"API request failed: {exc}") from exc
 
-    try:
-        data = json.loads(raw)
-    except json.JSONDecodeError as exc:
-        raise RuntimeError(f"Invalid API JSON response: {raw[:500]}") from exc
-
-    text = extract_text_from_response(data)
     if not text:
         raise RuntimeError("API returned empty output.")
     return text
@@ -250,8 +463,9 @@ def main() -> int:
     log_text = log_path.read_text(encoding="utf-8", errors="replace")
     if len(log_text) > args.max_log_chars:
         log_text = log_text[-args.max_log_chars :]
+    log_text = condense_log_text(log_text, max_chars=args.max_condensed_log_chars)
 
-    tracked_files = run_git_ls_files(repo_root)
+    tracked_files = load_tracked_files(repo_root)
     candidates = detect_candidate_files(
         log_text=log_text,
         repo_root=repo_root,
@@ -259,11 +473,23 @@ def main() -> int:
         max_candidates=args.max_candidate_files,
     )
     file_blocks: List[str] = []
-    for rel_path in candidates:
-        abs_path = repo_root / rel_path
-        snippet = read_file_snippet(abs_path, max_chars=args.max_snippet_chars)
-        if snippet:
-            file_blocks.append(f"### {rel_path}\n{snippet}")
+    if candidates:
+        with ThreadPoolExecutor(max_workers=min(8, len(candidates))) as executor:
+            snippets = list(
+                executor.map(
+                    lambda rel_path: read_file_snippet(repo_root / rel_path, max_chars=args.max_snippet_chars),
+                    candidates,
+                )
+            )
+        context_chars = 0
+        for rel_path, snippet in zip(candidates, snippets):
+            if not snippet:
+                continue
+            block = f"### {rel_path}\n{snippet}"
+            if file_blocks and context_chars + len(block) > args.max_file_context_chars:
+                break
+            file_blocks.append(block)
+            context_chars += len(block)
     file_context = "\n\n".join(file_blocks)
 
     system_prompt, user_prompt = build_prompts(
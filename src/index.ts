@@ -557,8 +557,10 @@ const globalCoordinator = CONCURRENCY_SLOT_LIMITS_ENABLED
   : null;
 
 // 登录超时冷却机制
-let loginTimeoutTimestamp: number | null = null;
+// 冷却截止时间（performance.now() 单调时钟，预先算好截止点，快路径只需一次比较）
+let loginCooldownUntilMs = 0;
 const LOGIN_COOLDOWN_SECONDS = 300; // 5 分钟
+const LOGIN_COOLDOWN_MINUTES = Math.floor(LOGIN_COOLDOWN_SECONDS / 60);
 
 // ============================================
 // 全局 CAPTCHA 处理状态
@@ -894,17 +896,11 @@ async function runBackgroundPrewarm(trigger: "startup" | "interval"): Promise<vo
 }
 
 // 检查是否为登录超时错误
+// 单次正则扫描代替逐个关键词 includes，避免每次调用 lowercase 整个错误串
+const LOGIN_TIMEOUT_ERROR_PATTERN = /验证超时|登录超时|timeout|5分钟|captcha|验证码/i;
+
 function isLoginTimeoutError(error: string): boolean {
-  const timeoutKeywords = [
-    "验证超时",
-    "登录超时",
-    "timeout",
-    "5分钟",
-    "captcha",
-    "验证码",
-  ];
-  const errorLower = error.toLowerCase();
-  return timeoutKeywords.some((kw) => errorLower.includes(kw.toLowerCase()));
+  return LOGIN_TIMEOUT_ERROR_PATTERN.test(error);
 }
 
 // 检查是否为“验证已完成但需要立即重试”的错误
@@ -982,11 +978,11 @@ server.tool(
       };
     }
 
-    // 检查是否在登录超时冷却期内
-    if (loginTimeoutTimestamp !== null) {
-      const elapsed = (Date.now() - loginTimeoutTimestamp) / 1000;
-      if (elapsed < LOGIN_COOLDOWN_SECONDS) {
-        const remaining = Math.floor(LOGIN_COOLDOWN_SECONDS - elapsed);
+    // 检查是否在登录超时冷却期内（单调时钟比较，系统时间跳变不影响）
+    {
+      const nowMs = performance.now();
+      if (nowMs < loginCooldownUntilMs) {
+        const remaining = Math.floor((loginCooldownUntilMs - nowMs) / 1000);
         const remainingMin = Math.floor(remaining / 60);
         console.error(`处于冷却期，剩余 ${remainingMin}分${remaining % 60}秒`);
         return {
@@ -1003,10 +999,6 @@ server.tool(
             },
           ],
         };
-      } else {
-        // 冷却期已过，重置状态
-        console.error("冷却期已过，重置状态");
-        loginTimeoutTimestamp = null;
       }
     }
 
@@ -1304,7 +1296,7 @@ server.tool(
         // 标记 CAPTCHA 处理结束
         markCaptchaEnd();
         console.error("检测到登录超时错误，启动冷却机制");
-        loginTimeoutTimestamp = Date.now();
+        loginCooldownUntilMs = performance.now() + LOGIN_COOLDOWN_SECONDS * 1000;
         return {
           content: [
             {
@@ -1312,7 +1304,7 @@ server.tool(
               text:
                 `## ⏸️ 搜索需要用户验证但超时\n\n` +
                 `**原因**: ${result.error}\n\n` +
-                `该工具将暂停 ${Math.floor(LOGIN_COOLDOWN_SECONDS / 60)} 分钟，避免重复打扰不在场的用户。\n\n` +
+                `该工具将暂停 ${LOGIN_COOLDOWN_MINUTES} 分钟，避免重复打扰不在场的用户。\n\n` +
                 `### 🔧 解决方案\n\n` +
                 `**前置条件**：确保已安装 Python 3 和 nodriver 依赖：\n\n` +
                 `\`\`\`bash\n` +
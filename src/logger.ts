@@ -35,9 +35,19 @@ function parseRetentionDays(raw: string | undefined): number {
 
 const LOG_RETENTION_DAYS = parseRetentionDays(process.env[LOG_RETENTION_ENV]);
 
+// 追加模式写入流：写入进内核缓冲异步落盘，热路径上不再为每行日志阻塞一次文件 I/O
+let logStream: fs.WriteStream | null = null;
+
 function appendRaw(line: string): void {
   try {
-    fs.appendFileSync(LOG_FILE, line);
+    if (!logStream) {
+      logStream = fs.createWriteStream(LOG_FILE, { flags: "a" });
+      // 打开失败（如目录尚未创建）时丢弃流，下次写入重试
+      logStream.on("error", () => {
+        logStream = null;
+      });
+    }
+    logStream.write(line);
   } catch {
     // ignore
   }
@@ -76,16 +86,19 @@ function cleanupOldLogs(): void {
       continue;
     }
 
-    if (!/^search_\d{4}-\d{2}-\d{2}\.log$/.test(entry.name)) {
+    const match = /^search_(\d{4}-\d{2}-\d{2})\.log$/.exec(entry.name);
+    if (!match) {
+      continue;
+    }
+
+    // 文件名里的日期就是写入日期，直接据此判断过期，省去每个文件一次 stat
+    const fileDateMs = Date.parse(`${match[1]}T23:59:59Z`);
+    if (!Number.isFinite(fileDateMs) || fileDateMs >= cutoff) {
       continue;
     }
 
-    const filePath = path.join(LOG_DIR, entry.name);
     try {
-      const stat = fs.statSync(filePath);
-      if (stat.mtimeMs < cutoff) {
-        fs.rmSync(filePath, { force: true });
-      }
+      fs.rmSync(path.join(LOG_DIR, entry.name), { force: true });
     } catch {
       // ignore
     }
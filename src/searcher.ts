@@ -110,6 +110,13 @@ const CAPTCHA_KEYWORDS = [
   "recaptcha",
 ];
 
+// 浏览器端验证码检测脚本：关键词扫描在页内完成，只回传布尔值
+const DETECT_CAPTCHA_JS = `(() => {
+  const keywords = ${JSON.stringify(CAPTCHA_KEYWORDS)};
+  const text = (document.body.innerText || '').toLowerCase();
+  return keywords.some((kw) => text.includes(kw));
+})()`;
+
 // AI 加载中关键词
 const AI_LOADING_KEYWORDS = [
   "正在思考",
@@ -128,6 +135,16 @@ const AI_LOADING_SELECTORS = [
   '.stop-button:not([hidden])',
 ];
 
+// 追问建议探测选择器（出现通常代表 AI 生成完成）
+const FOLLOW_UP_PROBE_SELECTORS = [
+  'div[data-subtree="aimc"] textarea',
+  'div[data-subtree="aimc"] input[type="text"]',
+  '[aria-label*="follow"]',
+  '[aria-label*="追问"]',
+  '[placeholder*="follow"]',
+  '[placeholder*="追问"]',
+];
+
 // 追问输入框选择器（按优先级排序）
 const FOLLOW_UP_SELECTORS = [
   'div[data-subtree="aimc"] textarea',
@@ -325,6 +342,9 @@ const BLOCKED_URL_PATTERNS = [
   "connect.facebook.net",
 ];
 
+// 代理探测结果缓存时长（毫秒）
+const PROXY_DETECT_CACHE_TTL_MS = 60 * 1000;
+
 // 会话超时时间（秒）
 const SESSION_TIMEOUT = 300; // 5 分钟
 const NODRIVER_DEFAULT_WAIT_SECONDS = 300;
@@ -1971,8 +1991,13 @@ async def main() -> int:
             try:
                 while True:
                     await asyncio.sleep(2)
+                    # Fast path: the browser process already exited.
+                    if getattr(browser, "stopped", False):
+                        break
                     try:
-                        await tab.get_content()
+                        # Cheap liveness ping instead of serializing the whole
+                        # DOM via get_content() on every iteration.
+                        await tab.evaluate("1")
                         # Browser is still alive — snapshot cookies
                         snapshot = await fetch_raw_cookies(tab, browser)
                         if snapshot:
@@ -1996,8 +2021,14 @@ async def main() -> int:
             deadline = time.monotonic() + max(10, int(args.wait_seconds))
             timeout_reason = "verification not completed"
             consent_logged = False
+            last_cookies = []
 
             while time.monotonic() < deadline:
+                # User closed the window — stop immediately instead of
+                # burning the rest of the deadline polling a dead browser.
+                if getattr(browser, "stopped", False):
+                    timeout_reason = "browser closed before verification completed"
+                    break
                 content = ""
                 current_url = ""
                 try:
@@ -2010,6 +2041,8 @@ async def main() -> int:
                     current_url = ""
 
                 raw_cookies = await fetch_raw_cookies(tab, browser)
+                if raw_cookies:
+                    last_cookies = raw_cookies
                 blocked = is_blocked_page(content, current_url)
                 consent = is_consent_page(content, current_url)
                 passed = has_pass_cookie(raw_cookies)
@@ -2033,7 +2066,7 @@ async def main() -> int:
 
                 await asyncio.sleep(2)
 
-            raw_cookies = await fetch_raw_cookies(tab, browser)
+            raw_cookies = await fetch_raw_cookies(tab, browser) or last_cookies
             if has_pass_cookie(raw_cookies):
                 local_storage = await fetch_local_storage(tab)
                 if save_storage_state(raw_cookies, local_storage, args.state_path):
@@ -2124,6 +2157,426 @@ function releaseCaptchaLock(): void {
   }
 }
 
+// 提取 AI 回答的浏览器端脚本（纯常量，模块加载时构建一次，
+// V8 可按脚本内容复用已编译代码，避免每次搜索重建/重编译）
+// 注意：模板字符串中的正则需要双重转义：\\s 在 TypeScript 中变成 \s
+const EXTRACT_AI_ANSWER_JS = `
+(() => {
+  const result = {
+    aiAnswer: '',
+    sources: [],
+    containerAnswerLength: 0
+  };
+  
+  // 多语言支持：AI 模式标签
+  const aiModeLabels = ['AI 模式', 'AI Mode', 'AI モード', 'AI 모드', 'KI-Modus', 'Mode IA'];
+  // 多语言支持：搜索结果标签
+  const searchResultLabels = ['搜索结果', 'Search Results', '検索結果', '검색결과', 'Suchergebnisse', 'Résultats de recherche'];
+  // 多语言支持：内容结束标记
+  const endMarkers = [
+    '相关搜索', 'Related searches', '関連する検索', '관련 검색',
+    '意见反馈', 'Send feedback', 'フィードバックを送信',
+    '帮助', 'Help', 'ヘルプ',
+    '隐私权', 'Privacy', 'プライバシー',
+    '条款', 'Terms', '利用規約',
+  ];
+  
+  // 需要清理的导航文本（使用字符串替换，避免正则转义问题）
+  const navStrings = [
+    'AI 模式',
+    '全部图片视频新闻更多',
+    '全部 图片 视频 新闻 更多',
+    '全部\\n图片\\n视频\\n新闻\\n更多',
+    '登录',
+    'AI 的回答未必正确无误，请注意核查',
+    'AI 回答可能包含错误。 了解详情',
+    'AI 回答可能包含错误。了解详情',
+    '请谨慎使用此类代码。',
+    '请谨慎使用此类代码',
+    'Use code with caution.',
+    'Use code with caution',
+    '全部显示',
+    '查看相关链接',
+    '关于这条结果',
+    'AI Mode',
+    'All Images Videos News More',
+    'All\\nImages\\nVideos\\nNews\\nMore',
+    'Sign in',
+    'AI responses may include mistakes. Learn more',
+    'AI responses may include mistakes.Learn more',
+    'AI overview',
+    'Show all',
+    'View related links',
+    'About this result',
+    'Accessibility links',
+    'Skip to main content',
+    'Accessibility help',
+    'Accessibility feedback',
+    'Filters and topics',
+    'AI Mode response is ready',
+    'AI モード',
+    'すべて 画像 動画 ニュース もっと見る',
+    'すべて\\n画像\\n動画\\nニュース\\nもっと見る',
+    'ログイン',
+    'AI の回答には間違いが含まれている場合があります。 詳細',
+    'すべて表示',
+    'ユーザー補助のリンク',
+    'メイン コンテンツにスキップ',
+    'ユーザー補助ヘルプ',
+    'ユーザー補助に関するフィードバック',
+    'フィルタとトピック',
+    'AI モードの回答が作成されました',
+    '无障碍功能链接',
+    '跳到主要内容',
+    '无障碍功能帮助',
+    '无障碍功能反馈',
+    '过滤条件和主题',
+  ];
+  
+  // 需要单独清理的单词（每行一个的情况）
+  const singleNavWords = [
+    '全部', '图片', '视频', '新闻', '更多',
+    'All', 'Images', 'Videos', 'News', 'More',
+    'すべて', '画像', '動画', 'ニュース', 'もっと見る',
+  ];
+  
+  // 需要清理的正则模式（数字+网站）
+  const numSitesPatterns = [
+    /\\d+\\s*个网站/g,
+    /\\d+\\s*sites?/gi,
+    /\\d+\\s*件のサイト/g,
+  ];
+  
+  const MAX_CONTENT_LENGTH = 50000;
+  
+  function findEndIndex(text, startPos) {
+    let endIdx = Math.min(text.length, startPos + MAX_CONTENT_LENGTH);
+    for (const marker of endMarkers) {
+      const idx = text.indexOf(marker, startPos);
+      if (idx !== -1 && idx < endIdx) {
+        endIdx = idx;
+      }
+    }
+    return endIdx;
+  }
+  
+  function cleanAnswer(text) {
+    let cleaned = text;
+    // 字符串替换
+    for (const str of navStrings) {
+      cleaned = cleaned.split(str).join('');
+    }
+    
+    // 清理开头的单独导航词（每行一个的情况）
+    // 只清理文本开头连续出现的导航词
+    const lines = cleaned.split('\\n');
+    let startIndex = 0;
+    for (let i = 0; i < Math.min(lines.length, 10); i++) {
+      const line = lines[i].trim();
+      if (singleNavWords.includes(line) || line === '') {
+        startIndex = i + 1;
+      } else {
+        break;
+      }
+    }
+    if (startIndex > 0) {
+      cleaned = lines.slice(startIndex).join('\\n');
+    }
+    
+    // 正则替换（数字+网站）
+    for (const pattern of numSitesPatterns) {
+      cleaned = cleaned.replace(pattern, '');
+    }
+    // 清理多余空行
+    cleaned = cleaned.replace(/\\n{3,}/g, '\\n\\n');
+    return cleaned.trim();
+  }
+  
+  // 优先从 AI 容器提取，避免只截到页面顶部欢迎语
+  const candidateSelectors = [
+    'div[data-subtree="aimc"]',
+    'div[data-attrid="wa:/m/0"]',
+    '[data-async-type="editableDirectAnswer"]',
+    '.wDYxhc',
+  ];
+  let containerAnswer = '';
+  for (const selector of candidateSelectors) {
+    const nodes = document.querySelectorAll(selector);
+    if (selector === 'div[data-subtree="aimc"]' && nodes.length > 1) {
+      // 对话模式：页面有多个 aimc 容器（每个回答一个），需要拼接所有容器内容
+      let combined = '';
+      for (const node of nodes) {
+        const raw = (node && ((node.innerText || node.textContent || ''))) || '';
+        if (!raw || raw.trim().length === 0) continue;
+        const cleaned = cleanAnswer(raw);
+        if (cleaned) {
+          combined += (combined ? '\\n\\n' : '') + cleaned;
+        }
+      }
+      if (combined.length > containerAnswer.length) {
+        containerAnswer = combined;
+      }
+    } else {
+      for (const node of nodes) {
+        const raw = (node && ((node.innerText || node.textContent || ''))) || '';
+        if (!raw || raw.trim().length === 0) continue;
+        const cleaned = cleanAnswer(raw);
+        if (cleaned.length > containerAnswer.length) {
+          containerAnswer = cleaned;
+        }
+      }
+    }
+  }
+
+  // 容器提取失败时才回退到整页文本的标签定位扫描，
+  // 常规路径不再为整页 innerText 做多标签 indexOf 与清洗
+  let fallbackAnswer = '';
+  if (containerAnswer.length < 40) {
+    const mainContent = document.body.innerText;
+
+    // 查找 AI 回答区域的起始位置
+    let aiModeIndex = -1;
+    for (const label of aiModeLabels) {
+      const idx = mainContent.indexOf(label);
+      if (idx !== -1) {
+        aiModeIndex = idx;
+        break;
+      }
+    }
+
+    // 查找搜索结果区域的起始位置
+    let searchResultIndex = -1;
+    for (const label of searchResultLabels) {
+      const idx = mainContent.indexOf(label);
+      if (idx !== -1 && (searchResultIndex === -1 || idx < searchResultIndex)) {
+        if (aiModeIndex === -1 || idx > aiModeIndex) {
+          searchResultIndex = idx;
+        }
+      }
+    }
+
+    if (aiModeIndex !== -1 && searchResultIndex !== -1) {
+      fallbackAnswer = cleanAnswer(mainContent.substring(aiModeIndex, searchResultIndex));
+    } else if (aiModeIndex !== -1) {
+      const endIndex = findEndIndex(mainContent, aiModeIndex + 100);
+      fallbackAnswer = cleanAnswer(mainContent.substring(aiModeIndex, endIndex));
+    } else {
+      const endIndex = findEndIndex(mainContent, 100);
+      fallbackAnswer = cleanAnswer(mainContent.substring(0, endIndex));
+    }
+  }
+
+  result.containerAnswerLength = containerAnswer.length;
+  result.aiAnswer =
+    containerAnswer.length >= 40
+      ? containerAnswer
+      : (containerAnswer.length > fallbackAnswer.length ? containerAnswer : fallbackAnswer);
+
+  const aiContainers = document.querySelectorAll('div[data-subtree="aimc"]');
+  const aiContainer = aiContainers.length > 0 ? aiContainers[0] : null;
+
+  // 提取 AI 生成图片（若有），用于在插件中内联展示
+  // 扫描所有 aimc 容器（对话模式下可能有多个）
+  const imageNodes = aiContainers.length > 0
+    ? Array.from(aiContainers).flatMap(c => Array.from(c.querySelectorAll('img[src]')))
+    : Array.from(document.querySelectorAll('img[src]'));
+  const seenImageUrls = new Set();
+  const imageUrls = [];
+
+  function resolveImageSrc(rawSrc) {
+    if (!rawSrc) return '';
+    const trimmed = String(rawSrc).trim();
+    if (!trimmed) return '';
+    if (trimmed.startsWith('data:image/')) {
+      return trimmed;
+    }
+    try {
+      const parsed = new URL(trimmed, location.href);
+      if (parsed.protocol !== 'http:' && parsed.protocol !== 'https:') {
+        return '';
+      }
+      return parsed.href;
+    } catch {
+      return '';
+    }
+  }
+
+  imageNodes.forEach((img) => {
+    const src = resolveImageSrc(img.getAttribute('src') || '');
+    if (!src || seenImageUrls.has(src)) {
+      return;
+    }
+
+    const width = Number(img.naturalWidth || img.width || 0);
+    const height = Number(img.naturalHeight || img.height || 0);
+
+    // 过滤 favicon / avatar / UI 图标等小图
+    if (width > 0 && height > 0 && (width < 180 || height < 180)) {
+      return;
+    }
+
+    const alt = String(img.getAttribute('alt') || '').toLowerCase();
+    if (alt.includes('avatar') || alt.includes('icon') || alt.includes('logo')) {
+      return;
+    }
+
+    seenImageUrls.add(src);
+    if (imageUrls.length < 4) {
+      imageUrls.push(src);
+    }
+  });
+
+  if (imageUrls.length > 0) {
+    const imageMarkdown = imageUrls
+      .map((src, index) => '![AI 生成图片 ' + (index + 1) + '](<' + src + '>)')
+      .join('\\n\\n');
+    if (imageMarkdown.trim().length > 0 && !result.aiAnswer.includes(imageMarkdown)) {
+      result.aiAnswer = (result.aiAnswer + '\\n\\n### 生成图片\\n\\n' + imageMarkdown).trim();
+    }
+  }
+  
+  // 提取来源链接（从 AI 模式容器中提取，扫描所有容器）
+  const linkNodes = aiContainers.length > 0
+    ? Array.from(aiContainers).flatMap(c => Array.from(c.querySelectorAll('a[href]')))
+    : Array.from(document.querySelectorAll('a[href]'));
+  const seenUrls = new Set();
+
+  function isGoogleHost(hostname) {
+    const host = (hostname || '').toLowerCase();
+    return (
+      host.includes('google.') ||
+      host.includes('gstatic.com') ||
+      host.includes('googleapis.com')
+    );
+  }
+
+  function resolveSourceHref(rawHref) {
+    if (!rawHref) return '';
+    try {
+      const parsed = new URL(rawHref);
+      if (parsed.protocol !== 'http:' && parsed.protocol !== 'https:') {
+        return '';
+      }
+
+      if (isGoogleHost(parsed.hostname)) {
+        const redirect = parsed.searchParams.get('url') || parsed.searchParams.get('q') || '';
+        if (!redirect) return '';
+
+        const target = new URL(redirect);
+        if (target.protocol !== 'http:' && target.protocol !== 'https:') {
+          return '';
+        }
+        if (isGoogleHost(target.hostname)) {
+          return '';
+        }
+        return target.href;
+      }
+
+      return parsed.href;
+    } catch {
+      return '';
+    }
+  }
+
+  linkNodes.forEach(link => {
+    const href = resolveSourceHref(link.href);
+    if (!href) {
+      return;
+    }
+    
+    if (seenUrls.has(href)) {
+      return;
+    }
+    
+    // 获取链接文本（尝试多种方式）
+    let text = link.textContent?.trim() || '';
+    
+    // 如果链接文本为空，尝试从父元素获取
+    if (text.length < 5) {
+      const parent = link.parentElement;
+      if (parent) {
+        text = parent.textContent?.trim() || '';
+      }
+    }
+    
+    // 如果还是太短，尝试从 aria-label 或 title 属性获取
+    if (text.length < 5) {
+      text = link.getAttribute('aria-label') || link.getAttribute('title') || '';
+    }
+    
+    // 从 URL 提取域名作为备用标题
+    if (text.length < 5) {
+      try {
+        const url = new URL(href);
+        text = url.hostname.replace('www.', '');
+      } catch {
+        text = href.substring(0, 50);
+      }
+    }
+    
+    seenUrls.add(href);
+    
+    if (result.sources.length < 10) {
+      result.sources.push({
+        title: text.substring(0, 200),
+        url: href,
+        snippet: ''
+      });
+    }
+  });
+  
+  return result;
+})()
+`;
+
+// 上下文初始化脚本：导航期间用 MutationObserver 监听 Cookie 同意按钮，
+// 出现即点击并停止观察，让同意处理与页面加载重叠而非事后串行补一次探测
+const CONSENT_AUTO_DISMISS_JS = `
+(() => {
+  const texts = ["全部接受", "Accept all", "すべて同意", "모두 수락"];
+  const ariaSelectors = ['[aria-label="全部接受"]', '[aria-label="Accept all"]'];
+  const isVisible = (el) => !!el && el.offsetParent !== null;
+
+  const tryClick = () => {
+    for (const sel of ariaSelectors) {
+      const el = document.querySelector(sel);
+      if (isVisible(el)) {
+        el.click();
+        return true;
+      }
+    }
+    for (const btn of document.querySelectorAll("button")) {
+      const text = btn.textContent || "";
+      if (isVisible(btn) && texts.some((t) => text.includes(t))) {
+        btn.click();
+        return true;
+      }
+    }
+    return false;
+  };
+
+  const start = () => {
+    if (tryClick()) {
+      return;
+    }
+    const observer = new MutationObserver(() => {
+      if (tryClick()) {
+        observer.disconnect();
+      }
+    });
+    observer.observe(document.documentElement, { childList: true, subtree: true });
+    // 对话框通常在加载早期出现，15 秒后停止观察避免常驻开销
+    setTimeout(() => observer.disconnect(), 15000);
+  };
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", start, { once: true });
+  } else {
+    start();
+  }
+})()
+`;
+
 export class AISearcher {
   private static readonly BASE_LAUNCH_ARGS = [
     "--disable-dev-shm-usage",
@@ -2145,6 +2598,10 @@ export class AISearcher {
   private lastAiAnswerTextOnly: string = "";
   private lastWasImageCreation: boolean = false;
   private storageStateMtimeMs: number = 0;
+  private lastStorageStateHash: string = "";
+  private cdpUrlBlocking: boolean = false;
+  private proxyCacheValue: string | undefined = undefined;
+  private proxyCacheAtMs: number = 0;
   private browserDataDir: string;
   private timeout: number;
   private headless: boolean;
@@ -2163,6 +2620,9 @@ export class AISearcher {
 
   private sessionId: string;
 
+  // 已解析的浏览器路径缓存（进程级），避免每次启动都重复 stat 探测
+  private static cachedBrowserPath: string | null = null;
+
   // 浏览器数据根目录（固定在用户目录，避免权限问题）
   private static readonly BROWSER_DATA_ROOT = path.join(os.homedir(), ".huge-ai-search", "browser_data");
 
@@ -2185,6 +2645,11 @@ export class AISearcher {
    * @throws Error 如果未找到 Edge 浏览器
    */
   private findBrowser(): string {
+    const cached = AISearcher.cachedBrowserPath;
+    if (cached && fs.existsSync(cached)) {
+      return cached;
+    }
+
     const platform = process.platform;
 
     // 仅支持 Edge 浏览器
@@ -2192,6 +2657,7 @@ export class AISearcher {
     for (const edgePath of edgePaths) {
       if (fs.existsSync(edgePath)) {
         console.error(`找到 Edge: ${edgePath}`);
+        AISearcher.cachedBrowserPath = edgePath;
         return edgePath;
       }
     }
@@ -2218,13 +2684,33 @@ export class AISearcher {
     return normalized === "0" || normalized === "false" || normalized === "no" || normalized === "off";
   }
 
+  /**
+   * 检测代理设置（结果带 TTL 缓存）
+   * 代理配置在连续搜索之间几乎不变，短期内复用上次探测结果，
+   * 避免每次会话重建都重新扫描本地端口。
+   */
+  private async detectProxy(): Promise<string | undefined> {
+    const nowMs = Date.now();
+    if (
+      this.proxyCacheAtMs > 0 &&
+      nowMs - this.proxyCacheAtMs < PROXY_DETECT_CACHE_TTL_MS
+    ) {
+      console.error(`使用缓存的代理检测结果: ${this.proxyCacheValue || "无代理"}`);
+      return this.proxyCacheValue;
+    }
+    const detected = await this.detectProxyUncached();
+    this.proxyCacheValue = detected;
+    this.proxyCacheAtMs = Date.now();
+    return detected;
+  }
+
   /**
    * 检测代理设置
    * 默认启用系统代理继承与本地端口自动探测。
    * 设置 HUGE_AI_SEARCH_USE_SYSTEM_PROXY=0 可关闭系统代理继承。
    * 设置 HUGE_AI_SEARCH_AUTO_DETECT_PROXY=0 可关闭本地端口自动探测。
    */
-  private async detectProxy(): Promise<string | undefined> {
+  private async detectProxyUncached(): Promise<string | undefined> {
     console.error("开始检测代理...");
 
     // 1. 应用级显式代理（最高优先级）
@@ -2305,10 +2791,19 @@ export class AISearcher {
       { port: 54321, note: "X-UI/3X-UI 面板端口（非浏览器代理）" },
     ];
 
-    for (const { port, proxyUrl, note, risky } of commonPorts) {
-      console.error(`检测端口 ${port}（${note}）...`);
-      const isOpen = await this.checkPort(port);
-      console.error(`端口 ${port} 状态: ${isOpen ? '开放' : '关闭'}`);
+    // 并发探测所有端口（每个探测超时 500ms），避免逐个端口串行等待
+    console.error(`并发检测 ${commonPorts.length} 个常见代理端口...`);
+    const probeResults = await Promise.all(
+      commonPorts.map(async (candidate) => ({
+        candidate,
+        isOpen: await this.checkPort(candidate.port),
+      }))
+    );
+
+    // 仍按原有优先级顺序选取第一个可用端口
+    for (const { candidate, isOpen } of probeResults) {
+      const { port, proxyUrl, note, risky } = candidate;
+      console.error(`端口 ${port}（${note}）状态: ${isOpen ? '开放' : '关闭'}`);
       if (!isOpen) {
         continue;
       }
@@ -3112,6 +3607,25 @@ export class AISearcher {
     return true;
   }
 
+  /**
+   * 在 CDP 层拦截广告/追踪 URL，让浏览器直接丢弃请求。
+   * 不经过 route 回调，不影响页面渲染与来源链接提取，可在会话启动时安全启用。
+   */
+  private async setupCdpUrlBlocking(page: Page): Promise<void> {
+    try {
+      const client = await page.context().newCDPSession(page);
+      await client.send("Network.enable");
+      await client.send("Network.setBlockedURLs", {
+        urls: BLOCKED_URL_PATTERNS.map((pattern) => `*${pattern}*`),
+      });
+      this.cdpUrlBlocking = true;
+      console.error("已设置 CDP 层广告/追踪 URL 拦截");
+    } catch (error) {
+      this.cdpUrlBlocking = false;
+      console.error(`CDP URL 拦截设置失败: ${error}`);
+    }
+  }
+
   /**
    * 设置资源拦截，加速页面加载
    */
@@ -3119,7 +3633,6 @@ export class AISearcher {
     try {
       await page.route("**/*", (route) => {
         const resourceType = route.request().resourceType();
-        const url = route.request().url();
 
         // 拦截无用资源类型
         if (BLOCKED_RESOURCE_TYPES.includes(resourceType)) {
@@ -3127,12 +3640,11 @@ export class AISearcher {
           return;
         }
 
-        // 拦截广告和追踪脚本
-        for (const pattern of BLOCKED_URL_PATTERNS) {
-          if (url.includes(pattern)) {
-            route.abort();
-            return;
-          }
+        // 拦截广告和追踪脚本（CDP 层已拦截时无需重复检查）
+        const url = route.request().url();
+        if (!this.cdpUrlBlocking && BLOCKED_URL_PATTERNS.some((pattern) => url.includes(pattern))) {
+          route.abort();
+          return;
         }
 
         route.continue();
@@ -3238,8 +3750,13 @@ export class AISearcher {
       }
 
       this.context = await this.browser.newContext(contextOptions);
+      // 同意对话框在导航期间就地消掉，handleCookieConsent 作为兜底保留
+      await this.context.addInitScript(CONSENT_AUTO_DISMISS_JS);
       this.page = await this.context.newPage();
 
+      // CDP 层 URL 拦截不走 route 回调，不影响来源链接提取，可直接启用
+      await this.setupCdpUrlBlocking(this.page);
+
       // 禁用资源拦截（会影响来源链接的提取）
       // await this.setupResourceInterception(this.page);
 
@@ -3318,8 +3835,24 @@ export class AISearcher {
     if (!this.context) return;
 
     const storageStatePath = this.getStorageStatePath();
+    let serialized: string;
     try {
-      await this.context.storageState({ path: storageStatePath });
+      serialized = JSON.stringify(await this.context.storageState());
+    } catch (error) {
+      console.error(`保存存储状态失败: ${error}`);
+      return;
+    }
+
+    // 内容没变就跳过写盘，避免每次搜索后重写整份 cookie/localStorage JSON
+    const stateHash = createHash("sha256").update(serialized).digest("hex");
+    if (stateHash === this.lastStorageStateHash && fs.existsSync(storageStatePath)) {
+      console.error("存储状态未变化，跳过写入");
+      return;
+    }
+
+    try {
+      fs.writeFileSync(storageStatePath, serialized);
+      this.lastStorageStateHash = stateHash;
       console.error("已保存存储状态");
     } catch (error) {
       console.error(`保存存储状态失败: ${error}`);
@@ -3335,75 +3868,57 @@ export class AISearcher {
     }
   }
 
-  /**
-   * 检测验证码页面
-   */
-  private isCaptchaPage(content: string): boolean {
-    const lowerContent = content.toLowerCase();
-    return CAPTCHA_KEYWORDS.some((kw) =>
-      lowerContent.includes(kw.toLowerCase())
-    );
-  }
-
   /**
    * 检测当前页面是否有验证码
    */
   private async detectCaptcha(): Promise<boolean> {
     if (!this.page) return false;
-    const content = await this.page.content();
-    return this.isCaptchaPage(content);
+    // 关键词扫描在页内完成，只回传一个布尔值，避免整页文本跨 CDP 传输
+    try {
+      return (await this.page.evaluate(DETECT_CAPTCHA_JS)) as boolean;
+    } catch {
+      return false;
+    }
   }
 
   /**
    * 处理 Cookie 同意对话框
    */
   private async handleCookieConsent(page: Page): Promise<boolean> {
-    const consentSelectors = [
-      'button:has-text("全部接受")',
-      'button:has-text("Accept all")',
-      'button:has-text("すべて同意")',
-      'button:has-text("모두 수락")',
-      '[aria-label="全部接受"]',
-      '[aria-label="Accept all"]',
-    ];
+    // 文本匹配与 aria-label 探测合并进一次 evaluate，
+    // 页内找到第一个可见按钮直接点击，取代逐选择器的多次 round-trip
+    const jsClickConsent = `
+    (() => {
+      const texts = ["全部接受", "Accept all", "すべて同意", "모두 수락"];
+      const ariaSelectors = ['[aria-label="全部接受"]', '[aria-label="Accept all"]'];
+      const isVisible = (el) => !!el && el.offsetParent !== null;
+
+      for (const sel of ariaSelectors) {
+        const el = document.querySelector(sel);
+        if (isVisible(el)) {
+          el.click();
+          return true;
+        }
+      }
 
-    for (const selector of consentSelectors) {
-      try {
-        const button = await page.$(selector);
-        if (button && (await button.isVisible())) {
-          console.error(`检测到 Cookie 同意对话框，点击: ${selector}`);
-          await button.click();
-          await page.waitForTimeout(1000);
+      const buttons = document.querySelectorAll("button");
+      for (const btn of buttons) {
+        const text = btn.textContent || "";
+        if (isVisible(btn) && texts.some((t) => text.includes(t))) {
+          btn.click();
           return true;
         }
-      } catch {
-        continue;
       }
-    }
+      return false;
+    })()
+    `;
 
-    // 备用方案：使用 JavaScript
     try {
-      const jsClickConsent = `
-      (() => {
-        const buttons = document.querySelectorAll("button");
-        for (const btn of buttons) {
-          const text = btn.textContent || "";
-          if (
-            text.includes("全部接受") ||
-            text.includes("Accept all") ||
-            text.includes("すべて同意")
-          ) {
-            btn.click();
-            return true;
-          }
-        }
-        return false;
-      })()
-      `;
-      const clicked = await page.evaluate(jsClickConsent) as boolean;
+      const clicked = (await page.evaluate(jsClickConsent)) as boolean;
       if (clicked) {
-        console.error("通过 JavaScript 点击了 Cookie 同意按钮");
-        await page.waitForTimeout(1000);
+        console.error("检测到 Cookie 同意对话框，已点击接受");
+        // 等待点击后的网络请求结束即可，无需固定等满 1 秒
+        await page.waitForLoadState("networkidle", { timeout: 1000 }).catch(() => {});
         return true;
       }
     } catch {
@@ -3420,48 +3935,40 @@ export class AISearcher {
     // 首先处理可能的 Cookie 同意对话框
     await this.handleCookieConsent(page);
 
-    // 优先策略：快速检查页面关键词
+    // 选择器与关键词合并为同一个浏览器端条件：
+    // 先同步探测一次（命中即返回），未命中再用单个 waitForFunction 等待，
+    // 避免逐选择器 1.5 秒轮询超时的串行叠加
+    const detectJs = `(() => {
+      const selectors = ${JSON.stringify(AI_SELECTORS)};
+      for (const sel of selectors) {
+        try {
+          if (document.querySelector(sel)) return true;
+        } catch {
+          // 忽略无效选择器
+        }
+      }
+      const keywords = ${JSON.stringify(AI_KEYWORDS)};
+      const text = document.body.innerText || '';
+      return keywords.some((kw) => text.includes(kw));
+    })()`;
+
     try {
-      const content = (await page.evaluate(
-        "document.body.innerText"
-      )) as string;
-      if (AI_KEYWORDS.some((kw) => content.includes(kw))) {
-        console.error("通过关键词快速检测到 AI 内容");
+      if ((await page.evaluate(detectJs)) as boolean) {
+        console.error("快速检测到 AI 内容");
         return true;
       }
     } catch {
       // ignore
     }
 
-    // 备用策略：尝试选择器
-    for (const selector of AI_SELECTORS) {
-      try {
-        await page.waitForSelector(selector, { timeout: 1500 });
-        console.error(`检测到 AI 回答区域: ${selector}`);
-        return true;
-      } catch {
-        continue;
-      }
-    }
-
-    // 最后策略：等待关键词出现
     console.error("未找到 AI 内容，等待页面加载...");
-    for (let i = 0; i < 3; i++) {
-      await page.waitForTimeout(1000);
-      try {
-        const content = (await page.evaluate(
-          "document.body.innerText"
-        )) as string;
-        if (AI_KEYWORDS.some((kw) => content.includes(kw))) {
-          console.error("通过关键词检测到 AI 内容");
-          return true;
-        }
-      } catch {
-        continue;
-      }
+    try {
+      await page.waitForFunction(detectJs, undefined, { timeout: 8000 });
+      console.error("检测到 AI 内容");
+      return true;
+    } catch {
+      return false;
     }
-
-    return false;
   }
 
   /**
@@ -3481,32 +3988,6 @@ export class AISearcher {
     return false;
   }
 
-  /**
-   * 检查页面上是否出现追问建议（表示 AI 生成完成）
-   */
-  private async checkFollowUpSuggestions(page: Page): Promise<boolean> {
-    const followUpSelectors = [
-      'div[data-subtree="aimc"] textarea',
-      'div[data-subtree="aimc"] input[type="text"]',
-      '[aria-label*="follow"]',
-      '[aria-label*="追问"]',
-      '[placeholder*="follow"]',
-      '[placeholder*="追问"]',
-    ];
-
-    for (const selector of followUpSelectors) {
-      try {
-        const element = await page.$(selector);
-        if (element && (await element.isVisible())) {
-          return true;
-        }
-      } catch {
-        continue;
-      }
-    }
-    return false;
-  }
-
   /**
    * 等待 AI 流式输出完成
    */
@@ -3541,13 +4022,31 @@ export class AISearcher {
     );
 
     const loadingKeywordsJson = JSON.stringify(AI_LOADING_KEYWORDS);
+    const loadingSelectorsJson = JSON.stringify(AI_LOADING_SELECTORS);
+    const followUpSelectorsJson = JSON.stringify(FOLLOW_UP_PROBE_SELECTORS);
 
     for (let i = 0; i < maxWaitSeconds * 2; i++) {
       try {
-        // 单次 evaluate 获取所有信息，避免多次 round-trip
+        // 单次 evaluate 获取所有信息（含加载指示器与追问建议探测），避免多次 round-trip
         const info = (await page.evaluate(`
           (() => {
             const loadingKws = ${loadingKeywordsJson};
+            const loadingSelectors = ${loadingSelectorsJson};
+            const followUpSelectors = ${followUpSelectorsJson};
+
+            function anyVisible(selectors) {
+              for (const sel of selectors) {
+                try {
+                  const matches = document.querySelectorAll(sel);
+                  for (const el of matches) {
+                    if (el.offsetParent !== null) return true;
+                  }
+                } catch {
+                  // 忽略无效选择器
+                }
+              }
+              return false;
+            }
 
             function isGoogleHost(hostname) {
               const host = (hostname || "").toLowerCase();
@@ -3597,6 +4096,8 @@ export class AISearcher {
               bodyLength: bodyText.length,
               sourceCount,
               isLoading,
+              hasLoadingIndicator: anyVisible(loadingSelectors),
+              hasFollowUp: anyVisible(followUpSelectors),
             };
           })()
         `)) as {
@@ -3604,6 +4105,8 @@ export class AISearcher {
           bodyLength: number;
           sourceCount: number;
           isLoading: boolean;
+          hasLoadingIndicator: boolean;
+          hasFollowUp: boolean;
         };
 
         // 使用 AI 容器长度做稳定性判断（如有容器），否则回退到 body 长度
@@ -3642,11 +4145,9 @@ export class AISearcher {
           elapsedSinceFirstContent >= noSourceFallbackObserveMs &&
           elapsedSinceLastGrowth >= noSourceGrowthQuietMs;
 
-        // 策略1：检查加载指示器
-        const hasLoadingIndicator = await this.checkLoadingIndicators(page);
-
-        // 策略2：检查追问建议是否出现
-        const hasFollowUp = await this.checkFollowUpSuggestions(page);
+        // 策略1：加载指示器；策略2：追问建议（均已并入上面的单次 evaluate）
+        const hasLoadingIndicator = info.hasLoadingIndicator;
+        const hasFollowUp = info.hasFollowUp;
 
         if (hasFollowUp && trackingLength >= minAiContentLength) {
           if (info.sourceCount >= 1) {
@@ -3720,19 +4221,39 @@ export class AISearcher {
   ): Promise<boolean> {
     const interval = 400;
     const maxChecks = Math.ceil(maxWaitMs / interval);
+    // 单次 evaluate 同时取加载指示器和内容长度，每轮只一次 CDP round-trip
+    const snapshotJs = `
+      (() => {
+        const selectors = ${JSON.stringify(AI_LOADING_SELECTORS)};
+        const isVisible = (el) => !!el && el.offsetParent !== null;
+        let loading = false;
+        for (const sel of selectors) {
+          try {
+            if (Array.from(document.querySelectorAll(sel)).some(isVisible)) {
+              loading = true;
+              break;
+            }
+          } catch {
+            // ignore bad selector
+          }
+        }
+        return { loading, length: (document.body.innerText || '').length };
+      })()
+    `;
     for (let i = 0; i < maxChecks; i++) {
       await page.waitForTimeout(interval);
-      if (await this.checkLoadingIndicators(page)) {
-        console.error("追问后检测到加载指示器，新内容已开始渲染");
-        return true;
-      }
       try {
-        const len = (await page.evaluate(
-          "document.body.innerText.length"
-        )) as number;
-        if (len > preSubmitLength + 20) {
+        const snapshot = (await page.evaluate(snapshotJs)) as {
+          loading: boolean;
+          length: number;
+        };
+        if (snapshot.loading) {
+          console.error("追问后检测到加载指示器，新内容已开始渲染");
+          return true;
+        }
+        if (snapshot.length > preSubmitLength + 20) {
           console.error(
-            `追问后页面内容已增长: ${preSubmitLength} → ${len}`
+            `追问后页面内容已增长: ${preSubmitLength} → ${snapshot.length}`
           );
           return true;
         }
@@ -3751,375 +4272,8 @@ export class AISearcher {
    * 提取 AI 回答
    */
   private async extractAiAnswer(page: Page): Promise<SearchResult> {
-    // 注意：在模板字符串中传递给 page.evaluate 的正则表达式需要双重转义
-    // \\s 在 TypeScript 中变成 \s，但传给浏览器时需要 \\\\s 才能变成 \s
-    const jsCode = `
-    (() => {
-      const result = {
-        aiAnswer: '',
-        sources: [],
-        containerAnswerLength: 0
-      };
-      
-      const mainContent = document.body.innerText;
-      
-      // 多语言支持：AI 模式标签
-      const aiModeLabels = ['AI 模式', 'AI Mode', 'AI モード', 'AI 모드', 'KI-Modus', 'Mode IA'];
-      // 多语言支持：搜索结果标签
-      const searchResultLabels = ['搜索结果', 'Search Results', '検索結果', '검색결과', 'Suchergebnisse', 'Résultats de recherche'];
-      // 多语言支持：内容结束标记
-      const endMarkers = [
-        '相关搜索', 'Related searches', '関連する検索', '관련 검색',
-        '意见反馈', 'Send feedback', 'フィードバックを送信',
-        '帮助', 'Help', 'ヘルプ',
-        '隐私权', 'Privacy', 'プライバシー',
-        '条款', 'Terms', '利用規約',
-      ];
-      
-      // 需要清理的导航文本（使用字符串替换，避免正则转义问题）
-      const navStrings = [
-        'AI 模式',
-        '全部图片视频新闻更多',
-        '全部 图片 视频 新闻 更多',
-        '全部\\n图片\\n视频\\n新闻\\n更多',
-        '登录',
-        'AI 的回答未必正确无误，请注意核查',
-        'AI 回答可能包含错误。 了解详情',
-        'AI 回答可能包含错误。了解详情',
-        '请谨慎使用此类代码。',
-        '请谨慎使用此类代码',
-        'Use code with caution.',
-        'Use code with caution',
-        '全部显示',
-        '查看相关链接',
-        '关于这条结果',
-        'AI Mode',
-        'All Images Videos News More',
-        'All\\nImages\\nVideos\\nNews\\nMore',
-        'Sign in',
-        'AI responses may include mistakes. Learn more',
-        'AI responses may include mistakes.Learn more',
-        'AI overview',
-        'Show all',
-        'View related links',
-        'About this result',
-        'Accessibility links',
-        'Skip to main content',
-        'Accessibility help',
-        'Accessibility feedback',
-        'Filters and topics',
-        'AI Mode response is ready',
-        'AI モード',
-        'すべて 画像 動画 ニュース もっと見る',
-        'すべて\\n画像\\n動画\\nニュース\\nもっと見る',
-        'ログイン',
-        'AI の回答には間違いが含まれている場合があります。 詳細',
-        'すべて表示',
-        'ユーザー補助のリンク',
-        'メイン コンテンツにスキップ',
-        'ユーザー補助ヘルプ',
-        'ユーザー補助に関するフィードバック',
-        'フィルタとトピック',
-        'AI モードの回答が作成されました',
-        '无障碍功能链接',
-        '跳到主要内容',
-        '无障碍功能帮助',
-        '无障碍功能反馈',
-        '过滤条件和主题',
-      ];
-      
-      // 需要单独清理的单词（每行一个的情况）
-      const singleNavWords = [
-        '全部', '图片', '视频', '新闻', '更多',
-        'All', 'Images', 'Videos', 'News', 'More',
-        'すべて', '画像', '動画', 'ニュース', 'もっと見る',
-      ];
-      
-      // 需要清理的正则模式（数字+网站）
-      const numSitesPatterns = [
-        /\\d+\\s*个网站/g,
-        /\\d+\\s*sites?/gi,
-        /\\d+\\s*件のサイト/g,
-      ];
-      
-      const MAX_CONTENT_LENGTH = 50000;
-      
-      function findEndIndex(startPos) {
-        let endIdx = Math.min(mainContent.length, startPos + MAX_CONTENT_LENGTH);
-        for (const marker of endMarkers) {
-          const idx = mainContent.indexOf(marker, startPos);
-          if (idx !== -1 && idx < endIdx) {
-            endIdx = idx;
-          }
-        }
-        return endIdx;
-      }
-      
-      function cleanAnswer(text) {
-        let cleaned = text;
-        // 字符串替换
-        for (const str of navStrings) {
-          cleaned = cleaned.split(str).join('');
-        }
-        
-        // 清理开头的单独导航词（每行一个的情况）
-        // 只清理文本开头连续出现的导航词
-        const lines = cleaned.split('\\n');
-        let startIndex = 0;
-        for (let i = 0; i < Math.min(lines.length, 10); i++) {
-          const line = lines[i].trim();
-          if (singleNavWords.includes(line) || line === '') {
-            startIndex = i + 1;
-          } else {
-            break;
-          }
-        }
-        if (startIndex > 0) {
-          cleaned = lines.slice(startIndex).join('\\n');
-        }
-        
-        // 正则替换（数字+网站）
-        for (const pattern of numSitesPatterns) {
-          cleaned = cleaned.replace(pattern, '');
-        }
-        // 清理多余空行
-        cleaned = cleaned.replace(/\\n{3,}/g, '\\n\\n');
-        return cleaned.trim();
-      }
-      
-      // 优先从 AI 容器提取，避免只截到页面顶部欢迎语
-      const candidateSelectors = [
-        'div[data-subtree="aimc"]',
-        'div[data-attrid="wa:/m/0"]',
-        '[data-async-type="editableDirectAnswer"]',
-        '.wDYxhc',
-      ];
-      let containerAnswer = '';
-      for (const selector of candidateSelectors) {
-        const nodes = document.querySelectorAll(selector);
-        if (selector === 'div[data-subtree="aimc"]' && nodes.length > 1) {
-          // 对话模式：页面有多个 aimc 容器（每个回答一个），需要拼接所有容器内容
-          let combined = '';
-          for (const node of nodes) {
-            const raw = (node && ((node.innerText || node.textContent || ''))) || '';
-            if (!raw || raw.trim().length === 0) continue;
-            const cleaned = cleanAnswer(raw);
-            if (cleaned) {
-              combined += (combined ? '\\n\\n' : '') + cleaned;
-            }
-          }
-          if (combined.length > containerAnswer.length) {
-            containerAnswer = combined;
-          }
-        } else {
-          for (const node of nodes) {
-            const raw = (node && ((node.innerText || node.textContent || ''))) || '';
-            if (!raw || raw.trim().length === 0) continue;
-            const cleaned = cleanAnswer(raw);
-            if (cleaned.length > containerAnswer.length) {
-              containerAnswer = cleaned;
-            }
-          }
-        }
-      }
-
-      // 查找 AI 回答区域的起始位置
-      let aiModeIndex = -1;
-      for (const label of aiModeLabels) {
-        const idx = mainContent.indexOf(label);
-        if (idx !== -1) {
-          aiModeIndex = idx;
-          break;
-        }
-      }
-      
-      // 查找搜索结果区域的起始位置
-      let searchResultIndex = -1;
-      for (const label of searchResultLabels) {
-        const idx = mainContent.indexOf(label);
-        if (idx !== -1 && (searchResultIndex === -1 || idx < searchResultIndex)) {
-          if (aiModeIndex === -1 || idx > aiModeIndex) {
-            searchResultIndex = idx;
-          }
-        }
-      }
-
-      let fallbackAnswer = '';
-      if (aiModeIndex !== -1 && searchResultIndex !== -1) {
-        fallbackAnswer = cleanAnswer(mainContent.substring(aiModeIndex, searchResultIndex));
-      } else if (aiModeIndex !== -1) {
-        const endIndex = findEndIndex(aiModeIndex + 100);
-        fallbackAnswer = cleanAnswer(mainContent.substring(aiModeIndex, endIndex));
-      } else {
-        const endIndex = findEndIndex(100);
-        fallbackAnswer = cleanAnswer(mainContent.substring(0, endIndex));
-      }
-
-      result.containerAnswerLength = containerAnswer.length;
-      result.aiAnswer =
-        containerAnswer.length >= 40
-          ? containerAnswer
-          : (containerAnswer.length > fallbackAnswer.length ? containerAnswer : fallbackAnswer);
-
-      const aiContainers = document.querySelectorAll('div[data-subtree="aimc"]');
-      const aiContainer = aiContainers.length > 0 ? aiContainers[0] : null;
-
-      // 提取 AI 生成图片（若有），用于在插件中内联展示
-      // 扫描所有 aimc 容器（对话模式下可能有多个）
-      const imageNodes = aiContainers.length > 0
-        ? Array.from(aiContainers).flatMap(c => Array.from(c.querySelectorAll('img[src]')))
-        : Array.from(document.querySelectorAll('img[src]'));
-      const seenImageUrls = new Set();
-      const imageUrls = [];
-
-      function resolveImageSrc(rawSrc) {
-        if (!rawSrc) return '';
-        const trimmed = String(rawSrc).trim();
-        if (!trimmed) return '';
-        if (trimmed.startsWith('data:image/')) {
-          return trimmed;
-        }
-        try {
-          const parsed = new URL(trimmed, location.href);
-          if (parsed.protocol !== 'http:' && parsed.protocol !== 'https:') {
-            return '';
-          }
-          return parsed.href;
-        } catch {
-          return '';
-        }
-      }
-
-      imageNodes.forEach((img) => {
-        const src = resolveImageSrc(img.getAttribute('src') || '');
-        if (!src || seenImageUrls.has(src)) {
-          return;
-        }
-
-        const width = Number(img.naturalWidth || img.width || 0);
-        const height = Number(img.naturalHeight || img.height || 0);
-
-        // 过滤 favicon / avatar / UI 图标等小图
-        if (width > 0 && height > 0 && (width < 180 || height < 180)) {
-          return;
-        }
-
-        const alt = String(img.getAttribute('alt') || '').toLowerCase();
-        if (alt.includes('avatar') || alt.includes('icon') || alt.includes('logo')) {
-          return;
-        }
-
-        seenImageUrls.add(src);
-        if (imageUrls.length < 4) {
-          imageUrls.push(src);
-        }
-      });
-
-      if (imageUrls.length > 0) {
-        const imageMarkdown = imageUrls
-          .map((src, index) => '![AI 生成图片 ' + (index + 1) + '](<' + src + '>)')
-          .join('\\n\\n');
-        if (imageMarkdown.trim().length > 0 && !result.aiAnswer.includes(imageMarkdown)) {
-          result.aiAnswer = (result.aiAnswer + '\\n\\n### 生成图片\\n\\n' + imageMarkdown).trim();
-        }
-      }
-      
-      // 提取来源链接（从 AI 模式容器中提取，扫描所有容器）
-      const linkNodes = aiContainers.length > 0
-        ? Array.from(aiContainers).flatMap(c => Array.from(c.querySelectorAll('a[href]')))
-        : Array.from(document.querySelectorAll('a[href]'));
-      const seenUrls = new Set();
-
-      function isGoogleHost(hostname) {
-        const host = (hostname || '').toLowerCase();
-        return (
-          host.includes('google.') ||
-          host.includes('gstatic.com') ||
-          host.includes('googleapis.com')
-        );
-      }
-
-      function resolveSourceHref(rawHref) {
-        if (!rawHref) return '';
-        try {
-          const parsed = new URL(rawHref);
-          if (parsed.protocol !== 'http:' && parsed.protocol !== 'https:') {
-            return '';
-          }
-
-          if (isGoogleHost(parsed.hostname)) {
-            const redirect = parsed.searchParams.get('url') || parsed.searchParams.get('q') || '';
-            if (!redirect) return '';
-
-            const target = new URL(redirect);
-            if (target.protocol !== 'http:' && target.protocol !== 'https:') {
-              return '';
-            }
-            if (isGoogleHost(target.hostname)) {
-              return '';
-            }
-            return target.href;
-          }
-
-          return parsed.href;
-        } catch {
-          return '';
-        }
-      }
-
-      linkNodes.forEach(link => {
-        const href = resolveSourceHref(link.href);
-        if (!href) {
-          return;
-        }
-        
-        if (seenUrls.has(href)) {
-          return;
-        }
-        
-        // 获取链接文本（尝试多种方式）
-        let text = link.textContent?.trim() || '';
-        
-        // 如果链接文本为空，尝试从父元素获取
-        if (text.length < 5) {
-          const parent = link.parentElement;
-          if (parent) {
-            text = parent.textContent?.trim() || '';
-          }
-        }
-        
-        // 如果还是太短，尝试从 aria-label 或 title 属性获取
-        if (text.length < 5) {
-          text = link.getAttribute('aria-label') || link.getAttribute('title') || '';
-        }
-        
-        // 从 URL 提取域名作为备用标题
-        if (text.length < 5) {
-          try {
-            const url = new URL(href);
-            text = url.hostname.replace('www.', '');
-          } catch {
-            text = href.substring(0, 50);
-          }
-        }
-        
-        seenUrls.add(href);
-        
-        if (result.sources.length < 10) {
-          result.sources.push({
-            title: text.substring(0, 200),
-            url: href,
-            snippet: ''
-          });
-        }
-      });
-      
-      return result;
-    })()
-    `;
-
     try {
-      const data = (await page.evaluate(jsCode)) as {
+      const data = (await page.evaluate(EXTRACT_AI_ANSWER_JS)) as {
         aiAnswer: string;
         sources: { title: string; url: string; snippet: string }[];
         images?: string[];
@@ -4240,37 +4394,62 @@ export class AISearcher {
   private async pickBestVisibleInput(selectors: string[]): Promise<any | null> {
     if (!this.page) return null;
 
-    let best: { element: any; score: number } | null = null;
-    for (const selector of selectors) {
-      try {
-        const elements = await this.page.$$(selector);
-        for (const element of elements) {
-          if (!(await element.isVisible())) {
+    // 单次 evaluateHandle 在浏览器端完成可见性过滤与打分，
+    // 避免逐选择器 query + isVisible + evaluate 的两位数次 round-trip
+    const jsCode = `
+      (() => {
+        const selectors = ${JSON.stringify(selectors)};
+        function isVisible(el) {
+          if (!el) return false;
+          const style = window.getComputedStyle(el);
+          if (style.visibility === 'hidden' || style.display === 'none') return false;
+          const rect = el.getBoundingClientRect();
+          return rect.width > 0 && rect.height > 0;
+        }
+        let best = null;
+        let bestScore = -Infinity;
+        const seen = new Set();
+        for (const selector of selectors) {
+          let elements = [];
+          try {
+            elements = document.querySelectorAll(selector);
+          } catch {
             continue;
           }
-          const score = (await element.evaluate(`
-            (el) => {
-              const rect = el.getBoundingClientRect ? el.getBoundingClientRect() : { top: 0 };
-              const inAiContainer = Boolean(el.closest && el.closest('div[data-subtree="aimc"]'));
-              const tag = String(el.tagName || "").toLowerCase();
-              const name = typeof el.name === "string" ? el.name : "";
-              const isEditable = Boolean(el.isContentEditable);
-              const editableBonus = isEditable ? 240 : tag === "textarea" ? 180 : 120;
-              const lowerHalfBonus = rect.top > window.innerHeight * 0.45 ? 200 : 0;
-              const inAiBonus = inAiContainer ? 1200 : 0;
-              const nonQBonus = name === "q" ? 0 : 40;
-              return inAiBonus + lowerHalfBonus + editableBonus + nonQBonus + Math.max(0, rect.top || 0);
+          for (const el of elements) {
+            if (seen.has(el) || !isVisible(el)) continue;
+            seen.add(el);
+            const rect = el.getBoundingClientRect ? el.getBoundingClientRect() : { top: 0 };
+            const inAiContainer = Boolean(el.closest && el.closest('div[data-subtree="aimc"]'));
+            const tag = String(el.tagName || '').toLowerCase();
+            const name = typeof el.name === 'string' ? el.name : '';
+            const isEditable = Boolean(el.isContentEditable);
+            const editableBonus = isEditable ? 240 : tag === 'textarea' ? 180 : 120;
+            const lowerHalfBonus = rect.top > window.innerHeight * 0.45 ? 200 : 0;
+            const inAiBonus = inAiContainer ? 1200 : 0;
+            const nonQBonus = name === 'q' ? 0 : 40;
+            const score = inAiBonus + lowerHalfBonus + editableBonus + nonQBonus + Math.max(0, rect.top || 0);
+            if (score > bestScore) {
+              bestScore = score;
+              best = el;
             }
-          `)) as number;
-          if (!best || score > best.score) {
-            best = { element, score };
           }
         }
-      } catch {
-        continue;
+        return best;
+      })()
+    `;
+
+    try {
+      const handle = await this.page.evaluateHandle(jsCode);
+      const element = handle.asElement();
+      if (!element) {
+        await handle.dispose();
+        return null;
       }
+      return element;
+    } catch {
+      return null;
     }
-    return best?.element ?? null;
   }
 
   /**
@@ -6129,8 +6308,11 @@ export class AISearcher {
       }
 
       try {
-        const content = (await page.evaluate("document.body.innerText")) as string;
-        if (AI_LOADING_KEYWORDS.some((kw) => content.includes(kw))) {
+        // 在浏览器端完成关键词匹配，只传回布尔值，避免整页文本跨 CDP 传输
+        const hasLoadingKeyword = (await page.evaluate(
+          `${JSON.stringify(AI_LOADING_KEYWORDS)}.some((kw) => document.body.innerText.includes(kw))`
+        )) as boolean;
+        if (hasLoadingKeyword) {
           console.error(`检测到图片回答加载关键词（第 ${i + 1} 秒）`);
           return true;
         }
@@ -6239,12 +6421,18 @@ export class AISearcher {
       return result;
     }
 
-    // 尝试模糊匹配
+    // 尝试模糊匹配：问题只可能出现在开头 20 个字符内，
+    // 用带起点的 startsWith 探测，避免为查找再切片分配一份前缀
     const queryNormalized = query.trim();
-    const contentStart = content.slice(0, queryNormalized.length + 50);
-
-    const pos = contentStart.indexOf(queryNormalized);
-    if (pos !== -1 && pos < 20) {
+    let pos = -1;
+    const maxStart = Math.min(20, content.length);
+    for (let i = 0; i < maxStart; i++) {
+      if (content.startsWith(queryNormalized, i)) {
+        pos = i;
+        break;
+      }
+    }
+    if (pos !== -1) {
       const result = content.slice(pos + queryNormalized.length).trim();
       console.error(`移除用户问题（模糊匹配）: '${query.slice(0, 30)}...'`);
       return result;
@@ -6253,6 +6441,22 @@ export class AISearcher {
     return content;
   }
 
+  /**
+   * 在整页回答中定位上一次回答的结束位置（-1 表示未找到）。
+   * 用上次回答的末尾 256 字符做哨兵搜索，扫描成本与上次回答长度无关；
+   * 哨兵是上次回答的后缀，哨兵未命中时完整回答必然也不在页面上，无需回退重扫。
+   */
+  private findLastAnswerEnd(fullText: string, lastText: string): number {
+    const SENTINEL_LENGTH = 256;
+    if (lastText.length > SENTINEL_LENGTH) {
+      const tail = lastText.slice(-SENTINEL_LENGTH);
+      const pos = fullText.indexOf(tail);
+      return pos === -1 ? -1 : pos + tail.length;
+    }
+    const pos = fullText.indexOf(lastText);
+    return pos === -1 ? -1 : pos + lastText.length;
+  }
+
   /**
    * 去除 extractAiAnswer 附加的 "### 生成图片" 图片 Markdown 尾部，
    * 只保留纯文本内容，用于增量对比时避免因图片 URL 变化导致 includes() 失配。
@@ -6500,10 +6704,7 @@ export class AISearcher {
       await this.waitForAiContent(this.page);
 
       // 检测验证码
-      const content = (await this.page.evaluate(
-        "document.body.innerText"
-      )) as string;
-      if (this.isCaptchaPage(content)) {
+      if (await this.detectCaptcha()) {
         console.error("检测到验证码页面！");
         if (hasImageInput) {
           const captchaResult = await this.handleCaptcha(url, effectivePrompt);
@@ -6832,8 +7033,7 @@ export class AISearcher {
       await this.waitForAiContent(this.page);
 
       // 检测验证码
-      const pageContent = (await this.page.evaluate("document.body.innerText")) as string;
-      if (this.isCaptchaPage(pageContent)) {
+      if (await this.detectCaptcha()) {
         console.error("[画图模式] 检测到验证码页面");
         return await this.handleCaptcha(url, normalizedQuery);
       }
@@ -6856,8 +7056,19 @@ export class AISearcher {
       console.error("[画图模式] 等待图片生成...");
       await this.waitForStreamingComplete(this.page, 30);
 
-      // 额外等待确保图片加载完成
-      await this.page.waitForTimeout(2000);
+      // 等待页面上的图片实际解码完成，而不是固定等满 2 秒；
+      // 超时兜底后照常提取，行为与原固定等待一致
+      await this.page
+        .waitForFunction(
+          `(() => {
+            const imgs = Array.from(document.querySelectorAll("img"));
+            const pending = imgs.filter((img) => img.offsetParent !== null && !img.complete);
+            return pending.length === 0;
+          })()`,
+          undefined,
+          { timeout: 2000 }
+        )
+        .catch(() => {});
 
       // 提取结果
       const extractedResult = await this.extractAiAnswer(this.page);
@@ -7349,10 +7560,7 @@ export class AISearcher {
         result.error = "提取过程中页面已关闭";
         return result;
       }
-      const content = (await this.page.evaluate(
-        "document.body.innerText"
-      )) as string;
-      if (this.isCaptchaPage(content)) {
+      if (await this.detectCaptcha()) {
         console.error("图片追问时检测到验证码！");
         await this.close();
         result.error = "需要验证，请重新搜索";
@@ -7407,10 +7615,11 @@ export class AISearcher {
       );
 
       if (extractedResult.success && this.lastAiAnswerTextOnly) {
-        if (fullTextOnly.includes(this.lastAiAnswerTextOnly)) {
-          const lastEndPos =
-            fullTextOnly.indexOf(this.lastAiAnswerTextOnly) +
-            this.lastAiAnswerTextOnly.length;
+        const lastEndPos = this.findLastAnswerEnd(
+          fullTextOnly,
+          this.lastAiAnswerTextOnly
+        );
+        if (lastEndPos !== -1) {
           let newContent = fullTextOnly.slice(lastEndPos).trim();
           if (newContent) {
             newContent = this.removeUserQueryFromContent(newContent, normalizedQuery);
@@ -7531,10 +7740,7 @@ export class AISearcher {
       await this.waitForStreamingComplete(this.page, streamingWaitSeconds);
 
       // 检查验证码
-      const content = (await this.page.evaluate(
-        "document.body.innerText"
-      )) as string;
-      if (this.isCaptchaPage(content)) {
+      if (await this.detectCaptcha()) {
         console.error("追问时检测到验证码！");
         await this.close();
         result.error = "需要验证，请重新搜索";
@@ -7577,9 +7783,11 @@ export class AISearcher {
       );
 
       if (extractedResult.success && this.lastAiAnswerTextOnly) {
-        if (fullTextOnly.includes(this.lastAiAnswerTextOnly)) {
-          const lastEndPos =
-            fullTextOnly.indexOf(this.lastAiAnswerTextOnly) + this.lastAiAnswerTextOnly.length;
+        const lastEndPos = this.findLastAnswerEnd(
+          fullTextOnly,
+          this.lastAiAnswerTextOnly
+        );
+        if (lastEndPos !== -1) {
           let newContent = fullTextOnly.slice(lastEndPos).trim();
           if (newContent) {
             newContent = this.removeUserQueryFromContent(newContent, query);